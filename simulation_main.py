@@ -4,13 +4,22 @@ IoT-Based Appliance Usage Tracker - Simulation Main File
 Author: Aybüke ŞENEL
 """
 
+import numpy as np
 import pandas as pd
+import asyncio
 import time
 import json
 from datetime import datetime
+import io
 import os
 import sys
-from collections import deque
+import zlib
+from functools import lru_cache
+from queue import Queue
+from threading import Event, Lock, RLock, Thread
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from types import SimpleNamespace
+import multiprocessing
 
 # Terminal utilities
 
@@ -25,18 +34,167 @@ class Colors:
     RESET = '\033[0m'
     BOLD = '\033[1m'
 
+# Pre-composed output fragments and %-format templates for repeated blocks
+_BAR = '=' * 80
+_RST = Colors.RESET
+_HDR = f"{Colors.BOLD}{Colors.CYAN}{_BAR}"
+
+_PUBLISH_HDR_FMT = (
+    f"\n{Colors.MAGENTA}{_BAR}\n"
+    f"{Colors.MAGENTA}[MQTT PUBLISH - %s]{_RST}%s\n"
+    f"{Colors.MAGENTA}{_BAR}{_RST}\n"
+    f"{Colors.BOLD}Topic:{_RST} {Colors.CYAN}%s{_RST}\n"
+    f"{Colors.BOLD}Publishing to MQTT:{_RST} topic={Colors.CYAN}%s{_RST}\n"
+)
+_JSON_MESSAGE_FMT = f"\n{Colors.BOLD}JSON Message:{_RST}\n{Colors.YELLOW}%s{_RST}\n"
+_POWER_INFO_FMT = (
+    f"\n{Colors.BOLD}Power Info:{_RST}\n"
+    f"  Current: {Colors.CYAN}%8.2f W{_RST} | "
+    f"Avg: {Colors.YELLOW}%8.2f W{_RST} | "
+    f"Msg: {Colors.BLUE}%6d{_RST}\n"
+    f"  [{Colors.GREEN}%s{_RST}]\n"
+    f"{Colors.MAGENTA}{_BAR}{_RST}\n\n"
+)
+_APP_REPORT_FMT = (
+    f"\n{Colors.GREEN}{_BAR}\n"
+    f"{Colors.GREEN}[APPLICATION LAYER]{_RST} Processing message #%s\n"
+    f"{Colors.GREEN}{_BAR}{_RST}\n"
+    f"{Colors.BOLD}Received from Communication Layer (MQTT):{_RST}\n"
+    f"  Topic: {Colors.CYAN}%s{_RST}\n"
+    f"  Device: {Colors.CYAN}%s{_RST}\n"
+    f"  Power: {Colors.YELLOW}%.2f W{_RST}\n"
+    f"  Timestamp: {Colors.BLUE}%s{_RST}\n"
+    f"\n{Colors.BOLD}JSON Payload (from Communication Layer):{_RST}\n"
+    f"{Colors.YELLOW}%s{_RST}\n"
+    f"\n{Colors.BOLD}Statistics:{_RST}\n"
+    f"  Avg Power: {Colors.YELLOW}%.2f W{_RST}\n"
+    f"  Max Power: {Colors.RED}%.2f W{_RST}\n"
+    f"  Min Power: {Colors.BLUE}%.2f W{_RST}\n"
+    f"  Messages: {Colors.CYAN}%d{_RST}\n"
+    f"{Colors.GREEN}{_BAR}{_RST}\n\n"
+)
+_PROGRESS_FMT = (
+    f"\r{Colors.CYAN}[PROGRESS%s]{_RST} [%s] %.1f%% | "
+    "Mesaj: %s/%s | "
+    "Ortalama Güç: %.2fW | "
+    "Süre: %.1fs"
+)
+
 def clear_screen():
-    """Clear terminal screen"""
-    os.system('clear' if os.name == 'posix' else 'cls')
+    """Clear terminal screen (skipped when output is redirected to a file or pipe)"""
+    if not sys.stdout.isatty():
+        return
+    _write("\033[H\033[2J")
+
+@lru_cache(maxsize=None)
+def _bar_table(width):
+    """Precomputed bar strings indexed by number of filled cells"""
+    return ["█" * filled + "░" * (width - filled) for filled in range(width + 1)]
+
+# Serializes terminal writes from concurrently simulated devices
+_PRINT_LOCK = Lock()
+
+# Set from main() to stop device threads (Ctrl+C only reaches the main thread)
+_STOP = Event()
+
+# Per-message output collects here and goes out with the next _write()
+_OUT = io.StringIO()
+
+def _write(text):
+    """Write buffered output plus a pre-assembled block with a single flush"""
+    with _PRINT_LOCK:
+        if _OUT.tell():
+            sys.stdout.write(_OUT.getvalue())
+            _OUT.seek(0)
+            _OUT.truncate(0)
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+def _redraw(frame):
+    """Redraw the dashboard in place, then show the output buffered since the last frame"""
+    with _PRINT_LOCK:
+        # Frame first: writing the buffer before it would let the redraw erase it
+        sys.stdout.write("\033[H" + frame + "\033[J")
+        if _OUT.tell():
+            sys.stdout.write(_OUT.getvalue())
+            _OUT.seek(0)
+            _OUT.truncate(0)
+        sys.stdout.flush()
+
+def _buffer(text):
+    """Queue output for the next _write() or dashboard refresh"""
+    with _PRINT_LOCK:
+        _OUT.write(text)
     
-# Optional MQTT support
+# Optional MQTT support (paho-mqtt or gmqtt), imported only when a real broker is used
+mqtt = None
+gmqtt = None
+
+def _import_mqtt_backend(backend):
+    """Import the client library for `backend` on first use; return True if it is installed."""
+    global mqtt, gmqtt
+    try:
+        if backend == "gmqtt":
+            import gmqtt
+        else:
+            import paho.mqtt.client as mqtt
+    except ImportError:
+        return False
+    return True
+
+# Optional fast JSON support
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional Arrow CSV support
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Optional Polars CSV support
 try:
-    import paho.mqtt.client as mqtt
-    MQTT_AVAILABLE = True
+    import polars as pl
+    POLARS_AVAILABLE = True
 except ImportError:
-    MQTT_AVAILABLE = False
-    print(f"{Colors.YELLOW}[WARNING]{Colors.RESET} paho-mqtt not installed. Using simulation mode only.")
-    print(f"{Colors.YELLOW}Install with: pip install paho-mqtt{Colors.RESET}\n")
+    POLARS_AVAILABLE = False
+
+# Optional JIT support
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Numeric kernels
+
+if NUMBA_AVAILABLE:
+    # Only reassociation/contraction: the running minimum starts at +inf, so no "ninf"
+    @njit(cache=True, fastmath={"reassoc", "contract"})
+    def _process_batch(power, total, mn, mx):
+        """Fold a power array into running (total, min, max); return them plus the batch count."""
+        for i in range(power.shape[0]):
+            v = power[i]
+            total += v
+            if v < mn:
+                mn = v
+            if v > mx:
+                mx = v
+        return total, mn, mx, power.shape[0]
+else:
+    def _process_batch(power, total, mn, mx):
+        """Fold a power array into running (total, min, max); return them plus the batch count."""
+        if power.shape[0]:
+            total += float(power.sum())
+            mn = min(mn, float(power.min()))
+            mx = max(mx, float(power.max()))
+        return total, mn, mx, power.shape[0]
     
 # Statistics
 
@@ -51,16 +209,41 @@ class LiveStats:
         self.max_power = 0.0
         self.min_power = float('inf')
         self.current_power = 0.0
-        self.recent_powers = deque(maxlen=20)
+        # Circular buffer of the most recent readings
+        self.recent = np.zeros(20, dtype=np.float64)
+        self.recent_idx = 0
         
     def add_data(self, power):
         """Add new data point"""
         self.message_count += 1
         self.total_power += power
-        self.max_power = max(self.max_power, power)
-        self.min_power = min(self.min_power, power)
+        if power > self.max_power:
+            self.max_power = power
+        if power < self.min_power:
+            self.min_power = power
         self.current_power = power
-        self.recent_powers.append(power)
+        self.recent[self.recent_idx % 20] = power
+        self.recent_idx += 1
+        
+    def add_batch(self, powers):
+        """Add multiple data points at once"""
+        powers = np.asarray(powers, dtype=np.float64)
+        if powers.size == 0:
+            return
+        self.total_power, self.min_power, self.max_power, count = _process_batch(
+            powers, self.total_power, self.min_power, self.max_power)
+        self.message_count += count
+        self.current_power = float(powers[-1])
+        
+        tail = powers[-20:]
+        start = self.recent_idx + powers.size - tail.size
+        self.recent[(start + np.arange(tail.size)) % 20] = tail
+        self.recent_idx += powers.size
+        
+    def get_recent_powers(self, count=20):
+        """Return up to `count` most recent readings, oldest first"""
+        n = min(count, self.recent_idx, 20)
+        return self.recent[(self.recent_idx - n + np.arange(n)) % 20]
         
     def get_avg_power(self):
         """Calculate average power"""
@@ -68,26 +251,40 @@ class LiveStats:
     
     def get_power_bar(self, width=30):
         """Generate power visualization bar"""
+        bars = _bar_table(width)
         if self.max_power == 0:
-            return "░" * width
+            return bars[0]
         
         normalized = (self.current_power / self.max_power) if self.max_power > 0 else 0
-        filled = int(normalized * width)
-        bar = "█" * filled + "░" * (width - filled)
-        return bar
+        filled = min(max(int(normalized * width), 0), width)
+        return bars[filled]
 
 # MQTT client
 
+def _topic_matches(topic_filter, topic):
+    """MQTT topic filter match supporting '+' and '#' wildcards"""
+    filter_parts = topic_filter.split("/")
+    topic_parts = topic.split("/")
+    for k, part in enumerate(filter_parts):
+        if part == "#":
+            return True
+        if k >= len(topic_parts) or (part != "+" and part != topic_parts[k]):
+            return False
+    return len(filter_parts) == len(topic_parts)
+
 class MQTTClient:
     
     def __init__(self, broker_host="localhost", broker_port=1883, 
-                 username=None, password=None, client_id=None):
+                 username=None, password=None, client_id=None, backend="paho"):
                      
-       """Initialize MQTT client."""
+        """Initialize MQTT client (backend: "paho" or "gmqtt")."""
                      
-        if not MQTT_AVAILABLE:
-            raise ImportError("paho-mqtt is not installed.")
+        if not _import_mqtt_backend(backend):
+            raise ImportError(f"{'gmqtt' if backend == 'gmqtt' else 'paho-mqtt'} is not installed.")
         
+        self.backend = backend
+        self._loop = None
+        self._loop_thread = None
         self.broker_host = broker_host
         self.broker_port = broker_port
         self.username = username
@@ -95,24 +292,16 @@ class MQTTClient:
         self.client_id = client_id or f"iot_simulator_{os.getpid()}"
         self.client = None
         self.connected = False
+        self._subscriptions = []
         
     def connect(self):
         """Connect to MQTT broker."""
         try:
-            self.client = mqtt.Client(client_id=self.client_id)
-            
-            # Set authentication
-            if self.username and self.password:
-                self.client.username_pw_set(self.username, self.password)
-            
-            # Set callbacks
-            self.client.on_connect = self._on_connect
-            self.client.on_disconnect = self._on_disconnect
-            self.client.on_publish = self._on_publish
-            
             print(f"{Colors.BLUE}[MQTT]{Colors.RESET} Connecting to broker: {Colors.CYAN}{self.broker_host}:{self.broker_port}{Colors.RESET}")
-            self.client.connect(self.broker_host, self.broker_port, keepalive=60)
-            self.client.loop_start()
+            if self.backend == "gmqtt":
+                self._connect_gmqtt()
+            else:
+                self._connect_paho()
             
             # Wait for connection
             timeout = 5
@@ -132,6 +321,46 @@ class MQTTClient:
             print(f"{Colors.RED}[MQTT ERROR]{Colors.RESET} Connection failed: {str(e)}{Colors.RESET}\n")
             return False
     
+    def _connect_paho(self):
+        """Create the paho client and start its network loop thread."""
+        self.client = mqtt.Client(client_id=self.client_id)
+        
+        # Set authentication
+        if self.username and self.password:
+            self.client.username_pw_set(self.username, self.password)
+        
+        # Let QoS 0 publishes queue up instead of stalling on the inflight window
+        # (0 = unbounded queue; PublishWorker's bounded queue applies backpressure)
+        self.client.max_inflight_messages_set(2000)
+        self.client.max_queued_messages_set(0)
+        
+        # Set callbacks
+        self.client.on_connect = self._on_connect
+        self.client.on_disconnect = self._on_disconnect
+        self.client.on_publish = self._on_publish
+        
+        self.client.connect(self.broker_host, self.broker_port, keepalive=60)
+        self.client.loop_start()
+    
+    def _connect_gmqtt(self):
+        """Create the gmqtt client on an asyncio loop running in a background thread."""
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = Thread(target=self._loop.run_forever, daemon=True)
+        self._loop_thread.start()
+        
+        self.client = gmqtt.Client(self.client_id)
+        if self.username and self.password:
+            self.client.set_auth_credentials(self.username, self.password)
+        
+        self.client.on_connect = lambda client, flags, rc, properties: self._on_connect(client, None, flags, rc)
+        self.client.on_disconnect = lambda client, packet, exc=None: self._on_disconnect(client, None, 0)
+        
+        future = asyncio.run_coroutine_threadsafe(
+            self.client.connect(self.broker_host, self.broker_port, keepalive=60,
+                                version=gmqtt.constants.MQTTv311),
+            self._loop)
+        future.result(timeout=5)
+    
     def _on_connect(self, client, userdata, flags, rc):
         """On connect callback."""
         if rc == 0:
@@ -152,153 +381,394 @@ class MQTTClient:
     
     def publish(self, topic, payload, qos=0, retain=False):
         
-       """Publish message to MQTT."""
+        """Publish message to MQTT."""
         
         if not self.connected:
-            print(f"{Colors.RED}[MQTT ERROR]{Colors.RESET} Not connected to broker!{Colors.RESET}")
+            _buffer(f"{Colors.RED}[MQTT ERROR]{Colors.RESET} Not connected to broker!{Colors.RESET}\n")
             return False
         
         try:
-            json_payload = json.dumps(payload)
-            result = self.client.publish(topic, json_payload, qos=qos, retain=retain)
+            if self.backend == "gmqtt":
+                # gmqtt writes to its transport, which must happen on the loop thread
+                self._loop.call_soon_threadsafe(self.client.publish, topic, payload, qos, retain)
+                return True
+            
+            result = self.client.publish(topic, payload, qos=qos, retain=retain)
             
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
                 return True
             else:
-                print(f"{Colors.RED}[MQTT ERROR]{Colors.RESET} Publish failed with code {result.rc}{Colors.RESET}")
+                _buffer(f"{Colors.RED}[MQTT ERROR]{Colors.RESET} Publish failed with code {result.rc}{Colors.RESET}\n")
                 return False
                 
         except Exception as e:
-            print(f"{Colors.RED}[MQTT ERROR]{Colors.RESET} Publish error: {str(e)}{Colors.RESET}")
+            _buffer(f"{Colors.RED}[MQTT ERROR]{Colors.RESET} Publish error: {str(e)}{Colors.RESET}\n")
             return False
     
+    def subscribe(self, topic_filter, callback, qos=0):
+        """Subscribe to a topic filter; callback receives (topic, payload_bytes)."""
+        if self.backend == "gmqtt":
+            self._subscriptions.append((topic_filter, callback))
+            self.client.on_message = self._dispatch_gmqtt
+            self._loop.call_soon_threadsafe(self.client.subscribe, topic_filter, qos)
+        else:
+            # Per-filter callbacks so several processors can share one connection
+            self.client.message_callback_add(
+                topic_filter, lambda client, userdata, msg: callback(msg.topic, msg.payload))
+            self.client.subscribe(topic_filter, qos=qos)
+    
+    def _dispatch_gmqtt(self, client, topic, payload, qos, properties):
+        """Route a gmqtt message to every subscription whose filter matches."""
+        for topic_filter, callback in self._subscriptions:
+            if _topic_matches(topic_filter, topic):
+                callback(topic, payload)
+        return 0
+    
     def disconnect(self):
         """Disconnect from broker."""
-        if self.client:
-            self.client.loop_stop()
+        if self.client and self.backend == "gmqtt":
+            asyncio.run_coroutine_threadsafe(self.client.disconnect(), self._loop).result(timeout=5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self.connected = False
+            print(f"{Colors.BLUE}[MQTT]{Colors.RESET} Disconnected{Colors.RESET}")
+        elif self.client:
+            # Disconnect while the network loop still runs so queued publishes go out first
             self.client.disconnect()
+            timeout = 5
+            start_time = time.time()
+            while self.connected and (time.time() - start_time) < timeout:
+                time.sleep(0.05)
+            self.client.loop_stop()
             self.connected = False
             print(f"{Colors.BLUE}[MQTT]{Colors.RESET} Disconnected{Colors.RESET}")
+
+class MQTTClientPool:
+    """Round-robin pool of MQTT connections to the same broker."""
+    
+    def __init__(self, size=4, broker_host="localhost", broker_port=1883,
+                 username=None, password=None, client_id=None, backend="paho"):
+        
+        """Create `size` clients with distinct client IDs."""
+        
+        base_id = client_id or f"iot_simulator_{os.getpid()}"
+        self.broker_host = broker_host
+        self.broker_port = broker_port
+        self.clients = [
+            MQTTClient(broker_host, broker_port, username, password,
+                       client_id=f"{base_id}_{k}", backend=backend)
+            for k in range(size)
+        ]
+        self._rr = 0
+    
+    @property
+    def connected(self):
+        """True while every pooled connection is up."""
+        return all(c.connected for c in self.clients)
+    
+    @property
+    def client(self):
+        """Underlying paho client of the first connection (used for subscriptions)."""
+        return self.clients[0].client
+    
+    def connect(self):
+        """Connect all pooled clients; on any failure disconnect the rest."""
+        for c in self.clients:
+            if not c.connect():
+                self.disconnect()
+                return False
+        return True
+    
+    def publish(self, topic, payload, qos=0, retain=False):
+        """Publish on the next connection in rotation (ordering is not preserved)."""
+        c = self.clients[self._rr]
+        self._rr = (self._rr + 1) % len(self.clients)
+        return c.publish(topic, payload, qos=qos, retain=retain)
+    
+    def subscribe(self, topic_filter, callback, qos=0):
+        """Subscribe on the first connection."""
+        self.clients[0].subscribe(topic_filter, callback, qos=qos)
+    
+    def disconnect(self):
+        """Disconnect all pooled clients."""
+        for c in self.clients:
+            c.disconnect()
+
+def _create_mqtt_client(pool_size=1, **kwargs):
+    """Create a single MQTTClient, or an MQTTClientPool when pool_size > 1."""
+    if pool_size > 1:
+        return MQTTClientPool(size=pool_size, **kwargs)
+    return MQTTClient(**kwargs)
+
+class PublishWorker:
+    """Publishes serialized payloads from a bounded queue on background threads."""
+    
+    def __init__(self, mqtt_client, num_threads=2, maxsize=10000):
+        self.mqtt_client = mqtt_client
+        self.queue = Queue(maxsize=maxsize)
+        # Publishes that failed on a worker thread (publish() only reports queueing)
+        self.failed = 0
+        self._failed_lock = Lock()
+        self.threads = [Thread(target=self._run, daemon=True) for _ in range(num_threads)]
+        for thread in self.threads:
+            thread.start()
+    
+    def publish(self, topic, payload, qos=0):
+        """Queue a serialized payload; blocks only while the queue is full.
+
+        Returns True once queued: failures happen later and are counted in failed.
+        """
+        self.queue.put((topic, payload, qos))
+        return True
+    
+    def _run(self):
+        """Worker loop: publish queued items until a None sentinel arrives."""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            topic, payload, qos = item
+            if not self.mqtt_client.publish(topic, payload, qos=qos):
+                with self._failed_lock:
+                    self.failed += 1
+    
+    def close(self):
+        """Drain the queue and stop the worker threads."""
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
             
+def _report_publish_failures(publisher):
+    """Print how many queued messages a PublishWorker failed to publish, if any."""
+    if publisher and publisher.failed:
+        _write(f"{Colors.RED}[MQTT ERROR]{Colors.RESET} {publisher.failed:,} queued messages "
+               f"failed to publish{Colors.RESET}\n\n")
+
 # MQTT publish
 
-def fake_mqtt_publish(topic, payload, stats, verbose=True, show_json=True):
-    
-   """Simulate MQTT publish."""
+def _dumps(payload):
+    """Serialize payload to compact JSON bytes."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload).encode('utf-8')
+
+def _dumps_compressed(payload):
+    """Serialize payload to zlib-compressed JSON bytes (for large batched messages)."""
+    return zlib.compress(_dumps(payload), 1)
+
+def _dumps_pretty(payload):
+    """Serialize payload to indented JSON for display."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(payload, indent=2)
+
+def _loads(raw):
+    """Parse JSON from bytes or str."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _update_stats(stats, payload):
+    """Record a single or batched payload and return the latest power."""
+    if "samples" in payload:
+        powers = [sample["power"] for sample in payload["samples"]]
+        stats.add_batch(powers)
+        return powers[-1] if powers else 0.0
     
     power = payload.get("power", 0.0)
-    timestamp = payload.get("timestamp", "")
-    
-    # Update statistics
     stats.add_data(power)
+    return power
+
+def fake_mqtt_publish(topic, payload, stats, verbose=True, show_json=True, processor=None):
     
-    # Format JSON
-    json_message = json.dumps(payload, indent=2)
+    """Simulate MQTT publish, delivering straight to the application layer if given."""
+    
+    # Update statistics
+    power = _update_stats(stats, payload)
     
     if verbose or show_json:
-        print(f"\n{Colors.MAGENTA}{'='*80}")
-        print(f"{Colors.MAGENTA}[MQTT PUBLISH - SIMULATION]{Colors.RESET}")
-        print(f"{Colors.MAGENTA}{'='*80}{Colors.RESET}")
-        print(f"{Colors.BOLD}Topic:{Colors.RESET} {Colors.CYAN}{topic}{Colors.RESET}")
-        print(f"{Colors.BOLD}Publishing to MQTT:{Colors.RESET} topic={Colors.CYAN}{topic}{Colors.RESET}")
+        buf = [_PUBLISH_HDR_FMT % ("SIMULATION", "", topic, topic)]
         
         if show_json:
-            print(f"\n{Colors.BOLD}JSON Message:{Colors.RESET}")
-            print(f"{Colors.YELLOW}{json_message}{Colors.RESET}")
-        
-        avg_power = stats.get_avg_power()
-        power_bar = stats.get_power_bar()
+            buf.append(_JSON_MESSAGE_FMT % _dumps_pretty(payload))
         
-        print(f"\n{Colors.BOLD}Power Info:{Colors.RESET}")
-        print(f"  Current: {Colors.CYAN}{power:>8.2f} W{Colors.RESET} | "
-              f"Avg: {Colors.YELLOW}{avg_power:>8.2f} W{Colors.RESET} | "
-              f"Msg: {Colors.BLUE}{stats.message_count:>6}{Colors.RESET}")
-        print(f"  [{Colors.GREEN}{power_bar}{Colors.RESET}]")
-        print(f"{Colors.MAGENTA}{'='*80}{Colors.RESET}\n")
-
-def real_mqtt_publish(mqtt_client, topic, payload, stats, verbose=True, show_json=True):
+        buf.append(_POWER_INFO_FMT % (power, stats.get_avg_power(), stats.message_count,
+                                      stats.get_power_bar()))
+        _buffer("".join(buf))
     
-    """Publish message to MQTT."""
+    # No broker in simulation mode: hand the already-extracted values to the processor
+    if processor is not None:
+        app_verbose = verbose or stats.message_count % 1000 == 0
+        device_id = payload.get("device_id", "unknown")
+        if "samples" in payload:
+            for sample in payload["samples"]:
+                processor.ingest(device_id, sample["timestamp"], sample["power"], topic=topic, verbose=app_verbose)
+        else:
+            processor.ingest(device_id, payload["timestamp"], power, topic=topic, verbose=app_verbose)
+
+def real_mqtt_publish(mqtt_client, topic, payload, stats, verbose=True, show_json=True,
+                      publisher=None, compress=False):
     
-    power = payload.get("power", 0.0)
-    timestamp = payload.get("timestamp", "")
+    """Publish message to MQTT, optionally through a background PublishWorker."""
     
     # Update statistics
-    stats.add_data(power)
-    
-    # Format JSON
-    json_message = json.dumps(payload, indent=2)
+    power = _update_stats(stats, payload)
     
-    success = mqtt_client.publish(topic, payload, qos=0)
+    data = _dumps_compressed(payload) if compress else _dumps(payload)
+    success = (publisher or mqtt_client).publish(topic, data, qos=0)
     
     # Display message
     if verbose or show_json:
-        status_color = Colors.GREEN if success else Colors.RED
-        status_text = "✓ PUBLISHED" if success else "✗ FAILED"
+        if publisher:
+            # The message is only queued here; show worker-side failures so far
+            status_color = Colors.RED if publisher.failed else Colors.GREEN
+            status_text = f"✗ QUEUED ({publisher.failed:,} failed)" if publisher.failed else "✓ QUEUED"
+        else:
+            status_color = Colors.GREEN if success else Colors.RED
+            status_text = "✓ PUBLISHED" if success else "✗ FAILED"
         
-        print(f"\n{Colors.MAGENTA}{'='*80}")
-        print(f"{Colors.MAGENTA}[MQTT PUBLISH - REAL]{Colors.RESET} {status_color}{status_text}{Colors.RESET}")
-        print(f"{Colors.MAGENTA}{'='*80}{Colors.RESET}")
-        print(f"{Colors.BOLD}Topic:{Colors.RESET} {Colors.CYAN}{topic}{Colors.RESET}")
-        print(f"{Colors.BOLD}Publishing to MQTT:{Colors.RESET} topic={Colors.CYAN}{topic}{Colors.RESET}")
-        print(f"{Colors.BOLD}Broker:{Colors.RESET} {Colors.CYAN}{mqtt_client.broker_host}:{mqtt_client.broker_port}{Colors.RESET}")
+        buf = [
+            _PUBLISH_HDR_FMT % ("REAL", f" {status_color}{status_text}{_RST}", topic, topic),
+            f"{Colors.BOLD}Broker:{_RST} {Colors.CYAN}{mqtt_client.broker_host}:{mqtt_client.broker_port}{_RST}\n",
+        ]
         
         if show_json:
-            print(f"\n{Colors.BOLD}JSON Message:{Colors.RESET}")
-            print(f"{Colors.YELLOW}{json_message}{Colors.RESET}")
-        
-        avg_power = stats.get_avg_power()
-        power_bar = stats.get_power_bar()
+            buf.append(_JSON_MESSAGE_FMT % _dumps_pretty(payload))
         
-        print(f"\n{Colors.BOLD}Power Info:{Colors.RESET}")
-        print(f"  Current: {Colors.CYAN}{power:>8.2f} W{Colors.RESET} | "
-              f"Avg: {Colors.YELLOW}{avg_power:>8.2f} W{Colors.RESET} | "
-              f"Msg: {Colors.BLUE}{stats.message_count:>6}{Colors.RESET}")
-        print(f"  [{Colors.GREEN}{power_bar}{Colors.RESET}]")
-        print(f"{Colors.MAGENTA}{'='*80}{Colors.RESET}\n")
+        buf.append(_POWER_INFO_FMT % (power, stats.get_avg_power(), stats.message_count,
+                                      stats.get_power_bar()))
+        _buffer("".join(buf))
+
+def _publish_silent(client, topic, payload_bytes, stats, power):
+    """Hot-path publish of a single pre-serialized message with no display."""
+    stats.add_data(power)
+    client.publish(topic, payload_bytes, qos=0)
 
 # Application layer
 
 class ApplicationLayer:
-   """Handle incoming MQTT messages."""
+    """Handle incoming MQTT messages."""
     
-    def __init__(self, mqtt_client=None, topic_filter="home/appliance/+/power"):
+    def __init__(self, mqtt_client=None, topic_filter="home/appliance/+/power/#", streaming_mode=False):
         
-       """Initialize application layer."""
+        """Initialize application layer (streaming_mode keeps statistics only, not messages)."""
         
-        self.received_messages = []
-        self.processed_count = 0
-        self.device_stats = {}
+        # Received messages stored column-wise; _i is the fill count
+        self.power = np.empty(1024, dtype=np.float64)
+        self.ts = np.empty(1024, dtype='datetime64[s]')
+        self.device = np.empty(1024, dtype=np.int16)
+        self.topic = np.empty(1024, dtype=np.int16)
+        self._i = 0
+        # In streaming mode the columns are a reusable window; _base counts discarded rows
+        self.streaming_mode = streaming_mode
+        self._base = 0
+        self._device_codes = {}
+        self._topic_codes = {}
+        # Statistics are reduced from the stored columns up to index _folded
+        self._device_stats = {}
+        self._folded = 0
+        self._fold_lock = RLock()
+        # Messages the publisher sent, when known (set by simulate_device)
+        self.total_records = None
         self.mqtt_client = mqtt_client
         self.topic_filter = topic_filter
         self.subscribed = False
+    
+    def preallocate(self, n):
+        """Reserve room for n more messages in the column arrays."""
+        if not self.streaming_mode and self._i + n > self.power.shape[0]:
+            self._resize(self._i + n)
+    
+    def _resize(self, capacity):
+        """Reallocate the column arrays, keeping stored messages."""
+        n = self._i
+        for name in ("power", "ts", "device", "topic"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:n] = old[:n]
+            setattr(self, name, new)
+    
+    @property
+    def processed_count(self):
+        """Number of messages received so far."""
+        return self._base + self._i
+    
+    @property
+    def received_messages(self):
+        """Stored messages as dicts, built on demand (not available in streaming mode)."""
+        if self.streaming_mode:
+            raise RuntimeError("received_messages is not kept in streaming mode; use device_stats")
+        n = self._i
+        device_ids = list(self._device_codes)
+        topics = list(self._topic_codes)
+        return [
+            {"device_id": device_ids[code], "timestamp": ts, "power": power, "topic": topics[topic]}
+            for code, ts, power, topic in zip(self.device[:n].tolist(),
+                                              np.datetime_as_string(self.ts[:n]).tolist(),
+                                              self.power[:n].tolist(),
+                                              self.topic[:n].tolist())
+        ]
+    
+    @property
+    def device_stats(self):
+        """Per-device totals, reduced from the stored power column."""
+        self._fold()
+        return self._device_stats
+    
+    def _fold(self):
+        """Reduce messages stored since the last fold into the per-device statistics."""
+        # ingest() folds on the MQTT callback thread while callers read device_stats
+        with self._fold_lock:
+            start, end = self._folded, self._i
+            if start == end:
+                return
+            power = self.power[start:end]
+            device = self.device[start:end]
+            single = len(self._device_codes) == 1
+            
+            for device_id, code in list(self._device_codes.items()):
+                arr = power if single else power[device == code]
+                if arr.size == 0:
+                    continue
+                stats = self._device_stats.get(device_id)
+                if stats is None:
+                    stats = self._device_stats[device_id] = {
+                        "message_count": 0,
+                        "total_power": 0.0,
+                        "max_power": 0.0,
+                        "min_power": float('inf'),
+                    }
+                stats["total_power"], stats["min_power"], stats["max_power"], count = _process_batch(
+                    arr, stats["total_power"], stats["min_power"], stats["max_power"])
+                stats["message_count"] += count
+            self._folded = end
         
-    def subscribe_to_mqtt(self):
-        """Subscribe to MQTT topic."""
+    def subscribe_to_mqtt(self, topic_filter=None):
+        """Subscribe to MQTT topic (defaults to the processor's topic filter)."""
         if not self.mqtt_client or not self.mqtt_client.connected:
             print(f"{Colors.YELLOW}[APPLICATION LAYER]{Colors.RESET} No MQTT client. Using simulation mode.{Colors.RESET}")
             return False
         
+        topic_filter = topic_filter or self.topic_filter
         try:
-            # Set callback
-            self.mqtt_client.client.on_message = self._on_mqtt_message
-            
-            self.mqtt_client.client.subscribe(self.topic_filter, qos=0)
+            self.mqtt_client.subscribe(topic_filter, self._on_mqtt_message, qos=0)
             self.subscribed = True
             
-            print(f"{Colors.GREEN}[APPLICATION LAYER]{Colors.RESET} Subscribed to topic: {Colors.CYAN}{self.topic_filter}{Colors.RESET}\n")
+            print(f"{Colors.GREEN}[APPLICATION LAYER]{Colors.RESET} Subscribed to topic: {Colors.CYAN}{topic_filter}{Colors.RESET}\n")
             return True
         except Exception as e:
             print(f"{Colors.RED}[APPLICATION LAYER ERROR]{Colors.RESET} Subscribe failed: {str(e)}{Colors.RESET}")
             return False
     
-    def _on_mqtt_message(self, client, userdata, msg):
+    def _on_mqtt_message(self, topic, raw_payload):
         """Handle incoming MQTT message."""
         
         try:
-            topic = msg.topic
-            json_payload = msg.payload.decode('utf-8')
-            payload = json.loads(json_payload)
+            if topic.endswith("/gz"):
+                raw_payload = zlib.decompress(raw_payload)
+            payload = _loads(raw_payload)
             
             self.process_json_message(topic, payload)
             
@@ -311,56 +781,59 @@ class ApplicationLayer:
         
         """Process MQTT message."""
         
+        if "samples" in payload:
+            device_id = payload.get("device_id", "unknown")
+            for sample in payload["samples"]:
+                self.ingest(device_id, sample.get("timestamp", ""), sample.get("power", 0.0),
+                            topic=topic, verbose=verbose)
+            return
+        
         try:
             device_id = payload.get("device_id", "unknown")
             timestamp = payload.get("timestamp", "")
             power = payload.get("power", 0.0)
             
-            # Update statistics
-            if device_id not in self.device_stats:
-                self.device_stats[device_id] = {
-                    "message_count": 0,
-                    "total_power": 0.0,
-                    "max_power": 0.0,
-                    "min_power": float('inf'),
-                }
-            
-            stats = self.device_stats[device_id]
-            stats["message_count"] += 1
-            stats["total_power"] += power
-            stats["max_power"] = max(stats["max_power"], power)
-            stats["min_power"] = min(stats["min_power"], power)
-            
-            self.received_messages.append({
-                "device_id": device_id,
-                "timestamp": timestamp,
-                "power": power,
-                "topic": topic
-            })
-            self.processed_count += 1
-            
-            # Display processing info
-            if verbose and self.processed_count % 100 == 0:
-                avg_power = stats["total_power"] / stats["message_count"]
-                print(f"\n{Colors.GREEN}{'='*80}")
-                print(f"{Colors.GREEN}[APPLICATION LAYER]{Colors.RESET} Processing message #{self.processed_count:,}")
-                print(f"{Colors.GREEN}{'='*80}{Colors.RESET}")
-                print(f"{Colors.BOLD}Received from Communication Layer (MQTT):{Colors.RESET}")
-                print(f"  Topic: {Colors.CYAN}{topic}{Colors.RESET}")
-                print(f"  Device: {Colors.CYAN}{device_id}{Colors.RESET}")
-                print(f"  Power: {Colors.YELLOW}{power:.2f} W{Colors.RESET}")
-                print(f"  Timestamp: {Colors.BLUE}{timestamp}{Colors.RESET}")
-                print(f"\n{Colors.BOLD}JSON Payload (from Communication Layer):{Colors.RESET}")
-                print(f"{Colors.YELLOW}{json.dumps(payload, indent=2)}{Colors.RESET}")
-                print(f"\n{Colors.BOLD}Statistics:{Colors.RESET}")
-                print(f"  Avg Power: {Colors.YELLOW}{avg_power:.2f} W{Colors.RESET}")
-                print(f"  Max Power: {Colors.RED}{stats['max_power']:.2f} W{Colors.RESET}")
-                print(f"  Min Power: {Colors.BLUE}{stats['min_power']:.2f} W{Colors.RESET}")
-                print(f"  Messages: {Colors.CYAN}{stats['message_count']}{Colors.RESET}")
-                print(f"{Colors.GREEN}{'='*80}{Colors.RESET}\n")
+            self.ingest(device_id, timestamp, power, topic=topic, verbose=verbose)
                 
         except Exception as e:
             print(f"{Colors.RED}[APPLICATION LAYER ERROR]{Colors.RESET} Processing failed: {str(e)}{Colors.RESET}")
+    
+    def ingest(self, device_id, timestamp, power, topic=None, verbose=False):
+        
+        """Record one reading from already-extracted values."""
+        
+        code = self._device_codes.get(device_id)
+        if code is None:
+            code = self._device_codes[device_id] = len(self._device_codes)
+        topic_code = self._topic_codes.get(topic)
+        if topic_code is None:
+            topic_code = self._topic_codes[topic] = len(self._topic_codes)
+        
+        i = self._i
+        if i == self.power.shape[0]:
+            if self.streaming_mode:
+                # Reduce the full window into the statistics and reuse it
+                with self._fold_lock:
+                    self._fold()
+                    self._base += i
+                    self._i = self._folded = i = 0
+            else:
+                self._resize(2 * i)
+        self.power[i] = power
+        self.ts[i] = timestamp
+        self.device[i] = code
+        self.topic[i] = topic_code
+        self._i = i + 1
+        
+        # Display processing info
+        if verbose and (self._base + self._i) % 100 == 0:
+            stats = self.device_stats[device_id]
+            avg_power = stats["total_power"] / stats["message_count"]
+            payload = {"device_id": device_id, "timestamp": timestamp, "power": power}
+            _buffer(_APP_REPORT_FMT % (
+                format(self._base + self._i, ","), topic, device_id, power, timestamp, _dumps_pretty(payload),
+                avg_power, stats["max_power"], stats["min_power"], stats["message_count"],
+            ))
 
 # Cloud processor
 
@@ -370,83 +843,210 @@ class CloudProcessor(ApplicationLayer):
 
 # Dashboard
 
+@lru_cache(maxsize=None)
+def _dashboard_template(device_id, device_name):
+    """Build the static dashboard layout once per device"""
+    device_id = str(device_id).replace("{", "{{").replace("}", "}}")
+    device_name = str(device_name).replace("{", "{{").replace("}", "}}")
+    lines = [
+        _HDR,
+        f"LIVE IoT SIMULATION DASHBOARD - {device_name}",
+        _BAR + _RST,
+        "",
+        f"{Colors.BOLD}Device Information:{Colors.RESET}",
+        f"  Device ID: {Colors.CYAN}{device_id}{Colors.RESET}",
+        f"  Device Name: {Colors.CYAN}{device_name}{Colors.RESET}",
+        "",
+        f"{Colors.BOLD}Real-time Statistics:{Colors.RESET}",
+        f"  Current Power:     {Colors.GREEN}{{current:>10.2f}} W{Colors.RESET}",
+        f"  Average Power:     {Colors.YELLOW}{{avg:>10.2f}} W{Colors.RESET}",
+        f"  Maximum Power:     {Colors.RED}{{max:>10.2f}} W{Colors.RESET}",
+        f"  Minimum Power:     {Colors.BLUE}{{min:>10.2f}} W{Colors.RESET}",
+        f"  Messages Processed: {Colors.CYAN}{{count:>10,}}{Colors.RESET}",
+        "",
+        f"{Colors.BOLD}Power Visualization:{Colors.RESET}",
+        f"  [{Colors.GREEN}{{bar}}{Colors.RESET}]",
+        f"  0{' ' * 24}Max: {{max:.2f}}W",
+        "",
+        f"{Colors.BOLD}Cloud Processor:{Colors.RESET}",
+        f"  Messages Processed: {Colors.GREEN}{{processed:,}}{Colors.RESET}",
+        "",
+        f"{Colors.BOLD}Recent Power Values:{Colors.RESET}",
+        "{recent}",
+        "",
+        f"{Colors.YELLOW}{'─'*80}{Colors.RESET}",
+        f"{Colors.MAGENTA}Processing MQTT messages...{Colors.RESET}",
+    ]
+    # Clear each line's remainder so a redraw fully overwrites the previous frame
+    return "\033[K\n".join(lines) + "\033[K\n"
+
 def print_dashboard(stats, processor):
     """Display live dashboard."""
-    clear_screen()
-    
-    print(f"{Colors.BOLD}{Colors.CYAN}{'='*80}")
-    print(f"LIVE IoT SIMULATION DASHBOARD - {stats.device_name}")
-    print("="*80 + Colors.RESET)
-    
     avg_power = stats.get_avg_power()
     power_bar = stats.get_power_bar(50)
     
-    print(f"\n{Colors.BOLD}Device Information:{Colors.RESET}")
-    print(f"  Device ID: {Colors.CYAN}{stats.device_id}{Colors.RESET}")
-    print(f"  Device Name: {Colors.CYAN}{stats.device_name}{Colors.RESET}")
-    
-    print(f"\n{Colors.BOLD}Real-time Statistics:{Colors.RESET}")
-    print(f"  Current Power:     {Colors.GREEN}{stats.current_power:>10.2f} W{Colors.RESET}")
-    print(f"  Average Power:     {Colors.YELLOW}{avg_power:>10.2f} W{Colors.RESET}")
-    print(f"  Maximum Power:     {Colors.RED}{stats.max_power:>10.2f} W{Colors.RESET}")
-    print(f"  Minimum Power:     {Colors.BLUE}{stats.min_power:>10.2f} W{Colors.RESET}")
-    print(f"  Messages Processed: {Colors.CYAN}{stats.message_count:>10,}{Colors.RESET}")
+    recent = stats.get_recent_powers(10)
+    recent_str = ""
+    if recent.size:
+        recent_str = "  " + " | ".join([f"{Colors.CYAN}{p:>6.2f}W{Colors.RESET}" for p in recent])
     
-    print(f"\n{Colors.BOLD}Power Visualization:{Colors.RESET}")
-    print(f"  [{Colors.GREEN}{power_bar}{Colors.RESET}]")
-    print(f"  0{' ' * 24}Max: {stats.max_power:.2f}W")
+    frame = _dashboard_template(stats.device_id, stats.device_name).format(
+        current=stats.current_power,
+        avg=avg_power,
+        max=stats.max_power,
+        min=stats.min_power,
+        count=stats.message_count,
+        bar=power_bar,
+        processed=processor.processed_count,
+        recent=recent_str,
+    )
     
-    print(f"\n{Colors.BOLD}Cloud Processor:{Colors.RESET}")
-    print(f"  Messages Processed: {Colors.GREEN}{processor.processed_count:,}{Colors.RESET}")
-    
-    print(f"\n{Colors.BOLD}Recent Power Values:{Colors.RESET}")
-    recent = list(stats.recent_powers)[-10:]
-    if recent:
-        recent_str = " | ".join([f"{Colors.CYAN}{p:>6.2f}W{Colors.RESET}" for p in recent])
-        print(f"  {recent_str}")
+    # Redraw in place from the top-left corner, then erase anything below
+    _redraw(frame)
+
+def print_progress(done, total_records, stats, start_time, label=False):
+    """Display single-line progress bar (label=True tags it with the device id)."""
+    progress = (done / total_records) * 100
+    progress_bar_length = 50
+    filled = int(progress_bar_length * progress / 100)
+    bar = _bar_table(progress_bar_length)[filled]
     
-    print(f"\n{Colors.YELLOW}{'─'*80}{Colors.RESET}")
-    print(f"{Colors.MAGENTA}Processing MQTT messages...{Colors.RESET}")
+    avg_power = stats.get_avg_power()
+    elapsed_time = time.time() - start_time
+    tag = " " + stats.device_id if label else ""
+    _buffer(_PROGRESS_FMT % (tag, bar, progress, format(done, ","), format(total_records, ","),
+                            avg_power, elapsed_time))
 
 # Device simulation
 
+def _count_records(csv_file):
+    """Count data rows in a CSV file without parsing it."""
+    with open(csv_file, 'rb') as f:
+        next(f, None)  # header
+        return sum(1 for line in f if line.strip())
+
+def _iter_chunks(csv_file, total_records, chunksize, reader="pandas"):
+    """Yield (iso_timestamps, powers) arrays for successive chunks of a CSV file."""
+    if total_records <= 0:
+        return
+    if reader == "pyarrow":
+        yield from _iter_chunks_pyarrow(csv_file, total_records)
+        return
+    if reader == "polars":
+        yield from _iter_chunks_polars(csv_file, total_records, chunksize)
+        return
+    with pd.read_csv(csv_file, parse_dates=["timestamp"], chunksize=chunksize,
+                     nrows=total_records) as reader:
+        for chunk in reader:
+            iso_strings = chunk["timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%S").to_numpy()
+            pw_arr = chunk["power"].to_numpy(np.float64)
+            yield iso_strings, pw_arr
+
+def _iter_chunks_pyarrow(csv_file, total_records):
+    """Stream record batches with Arrow's multithreaded CSV parser."""
+    # Timestamps are read as text: Arrow rejects UTC offsets for a naive timestamp column
+    convert_options = pa_csv.ConvertOptions(
+        column_types={"timestamp": pa.string(), "power": pa.float64()},
+        include_columns=["timestamp", "power"],
+    )
+    # 16 MiB blocks: fewer, larger batches for the parser threads to split up
+    read_options = pa_csv.ReadOptions(block_size=16 << 20)
+    remaining = total_records
+    with pa_csv.open_csv(csv_file, read_options=read_options,
+                         convert_options=convert_options) as reader:
+        for record_batch in reader:
+            if remaining <= 0:
+                break
+            record_batch = record_batch.slice(0, remaining)
+            remaining -= record_batch.num_rows
+            
+            # Keep the wall-clock time and drop any offset, like pandas
+            timestamps = pc.cast(pc.utf8_slice_codeunits(record_batch.column("timestamp"), 0, 19),
+                                 pa.timestamp("s"))
+            iso_strings = pc.strftime(timestamps, format="%Y-%m-%dT%H:%M:%S").to_numpy(zero_copy_only=False)
+            pw_arr = record_batch.column("power").to_numpy(zero_copy_only=False)
+            yield iso_strings, pw_arr
+
+def _iter_chunks_polars(csv_file, total_records, chunksize):
+    """Stream batches with Polars' batched CSV reader in a single linear pass."""
+    if hasattr(pl, "read_csv_batched"):
+        reader = pl.read_csv_batched(csv_file, batch_size=chunksize, n_rows=total_records)
+        frames = (df for batches in iter(lambda: reader.next_batches(4), None) for df in batches)
+    else:
+        # read_csv_batched was removed in Polars 2.0
+        frames = (pl.scan_csv(csv_file)
+                  .head(total_records)
+                  .collect_batches(chunk_size=chunksize))
+    
+    for df in frames:
+        # Timestamps stay text until here so offsets can be dropped (wall-clock time, like
+        # pandas) instead of being converted to UTC
+        timestamps = df["timestamp"].str.slice(0, 19).str.to_datetime()
+        iso_strings = timestamps.dt.strftime("%Y-%m-%dT%H:%M:%S").to_numpy()
+        pw_arr = df["power"].cast(pl.Float64).to_numpy()
+        yield iso_strings, pw_arr
+
 def simulate_device(device_name, csv_file, device_id, topic_prefix, 
-                    sample_size=None, publish_rate=10000.0, mqtt_client=None):
-    """Simulate IoT device."""
+                    sample_size=None, publish_rate=10000.0, mqtt_client=None,
+                    batch_size=1, fast_mode=False, chunksize=100_000, reader="pyarrow",
+                    publish_threads=2, compress=False, topic=None, streaming_mode=False,
+                    dashboard=True):
+    """Simulate IoT device (topic defaults to {topic_prefix}/{device_id}/power).
+
+    dashboard=False replaces the full-screen live dashboard with plain scrolling
+    output, for runs where several devices share one terminal. The dashboard is
+    also skipped when stdout is not a terminal.
+    """
+    
+    publisher = None
+    base_topic = topic or f"{topic_prefix}/{device_id}/power"
     
     try:
-        # Load dataset
+        # Count records up front; the data itself is streamed in chunks
         print(f"{Colors.BLUE}[LOADING]{Colors.RESET} Reading {csv_file}...")
-        df = pd.read_csv(csv_file, parse_dates=["timestamp"])
-        print(f"{Colors.GREEN}[LOADED]{Colors.RESET} {len(df):,} records loaded\n")
+        available_records = _count_records(csv_file)
+        print(f"{Colors.GREEN}[LOADED]{Colors.RESET} {available_records:,} records found "
+              f"(streaming in chunks of {chunksize:,})\n")
         
         # Initialize statistics and Application Layer
         stats = LiveStats(device_id, device_name)
-        processor = ApplicationLayer(mqtt_client=mqtt_client, topic_filter=f"{topic_prefix}/+/power")
+        processor = ApplicationLayer(mqtt_client=mqtt_client, topic_filter=f"{base_topic}/#",
+                                     streaming_mode=streaming_mode)
         
         if mqtt_client and mqtt_client.connected:
             processor.subscribe_to_mqtt()
+            
+            # Decouple network writes from the simulation loop
+            if publish_threads > 0:
+                publisher = PublishWorker(mqtt_client, num_threads=publish_threads)
         
         # Prepare data
         if sample_size is None:
-            sample_df = df
-            total_records = len(df)
+            total_records = available_records
             print(f"{Colors.GREEN}[INFO]{Colors.RESET} Using ALL {total_records:,} records from dataset")
         else:
-            sample_df = df.head(sample_size)
-            total_records = len(sample_df)
+            total_records = min(sample_size, available_records)
             print(f"{Colors.GREEN}[INFO]{Colors.RESET} Using {total_records:,} records from dataset")
+        processor.total_records = total_records
+        processor.preallocate(total_records)
+        
+        if (reader == "pyarrow" and not PYARROW_AVAILABLE) or (reader == "polars" and not POLARS_AVAILABLE):
+            reader = "pandas"
+        chunks = _iter_chunks(csv_file, total_records, chunksize, reader)
         
         print(f"{Colors.BOLD}Starting data stream simulation...{Colors.RESET}\n")
         
         # Calculate estimated time
-        estimated_seconds = total_records / publish_rate
-        estimated_minutes = estimated_seconds / 60
-        
-        if estimated_minutes >= 1:
-            print(f"{Colors.YELLOW}Estimated time: ~{estimated_minutes:.1f} minutes{Colors.RESET}")
+        if publish_rate:
+            estimated_seconds = total_records / publish_rate
+            estimated_minutes = estimated_seconds / 60
+            
+            if estimated_minutes >= 1:
+                print(f"{Colors.YELLOW}Estimated time: ~{estimated_minutes:.1f} minutes{Colors.RESET}")
+            else:
+                print(f"{Colors.YELLOW}Estimated time: ~{estimated_seconds:.0f} seconds{Colors.RESET}")
         else:
-            print(f"{Colors.YELLOW}Estimated time: ~{estimated_seconds:.0f} seconds{Colors.RESET}")
+            print(f"{Colors.YELLOW}Publish rate: unthrottled{Colors.RESET}")
         
         print(f"{Colors.YELLOW}Press Ctrl+C to stop{Colors.RESET}\n")
         time.sleep(2)
@@ -454,99 +1054,367 @@ def simulate_device(device_name, csv_file, device_id, topic_prefix,
         # Dashboard update frequency
         dashboard_update_interval = 100 if total_records > 1000 else 1
         
+        # Without a dashboard a refresh only flushes the buffered output; redirected
+        # output gets none, as its cursor-movement codes would just pile up in the log
+        dashboard = dashboard and sys.stdout.isatty()
+        if dashboard:
+            def refresh():
+                print_dashboard(stats, processor)
+        else:
+            def refresh():
+                _write("")
+        
         start_time = time.time()
         
-        # Simulation loop
-        for i, row in sample_df.iterrows():
-            # Create MQTT payload
+        # Topic and payload are built once and updated in place for each record
+        batch = []
+        compress = compress and batch_size > 1
+        if batch_size > 1:
+            topic = f"{base_topic}/batch"
+            if compress:
+                topic += "/gz"
+            payload = {
+                "device_id": device_id,
+                "samples": batch
+            }
+        else:
+            topic = base_topic
             payload = {
                 "device_id": device_id,
-                "timestamp": row["timestamp"].isoformat(),
-                "power": float(row["power"])
+                "timestamp": "",
+                "power": 0.0
             }
+        
+        # Pace in groups (~100 clock checks per second) rather than per message
+        interval = 1.0 / publish_rate if publish_rate else 0.0
+        pace_every = max(1, int(publish_rate // 100)) if publish_rate else 0
+        pace_start = time.perf_counter()
+        
+        # Bind hot-loop attribute and global lookups to locals
+        perf = time.perf_counter
+        sleep = time.sleep
+        dumps = _dumps_compressed if compress else _dumps
+        append_sample = batch.append
+        process = processor.process_json_message
+        publish_target = publisher or mqtt_client
+        publish = publish_target.publish if publish_target else None
+        
+        offset = 0
+        
+        # Simulation loop
+        for iso_strings, pw_arr in chunks:
+            for j in range(pw_arr.size):
+                i = offset + j
+                power = pw_arr[j]
             
-            # MQTT topic
-            topic = f"{topic_prefix}/{device_id}/power"
+                # Fill MQTT payload (batched payloads carry several samples)
+                if batch_size > 1:
+                    append_sample({"timestamp": iso_strings[j], "power": power})
+                    ready = len(batch) == batch_size or (i + 1) == total_records
+                else:
+                    ready = True
+                    payload["timestamp"] = iso_strings[j]
+                    payload["power"] = power
             
-            # Update dashboard periodically
-            if (i + 1) % dashboard_update_interval == 0 or (i + 1) == total_records:
-                print_dashboard(stats, processor)
+                # Update dashboard periodically (fast_mode refreshes once per chunk)
+                if not fast_mode and ((i + 1) % dashboard_update_interval == 0 or (i + 1) == total_records):
+                    refresh()
             
-            verbose = False  
+                if ready and fast_mode:
+                    # Publish without per-message statistics or console output
+                    if mqtt_client and mqtt_client.connected:
+                        publish(topic, dumps(payload), qos=0)
+                    else:
+                        process(topic, payload, verbose=False)
+                    batch.clear()
+                elif ready:
+                    show_json = (
+                        stats.message_count == 1 or  
+                        stats.message_count % 1000 == 0 or  
+                        (i + 1) == total_records 
+                    )
+                
+                    show_summary = stats.message_count % 100 == 0
+                
+                    if mqtt_client and mqtt_client.connected:
+                        if show_summary or show_json or batch_size > 1:
+                            real_mqtt_publish(mqtt_client, topic, payload, stats, verbose=show_summary,
+                                              show_json=show_json, publisher=publisher, compress=compress)
+                        else:
+                            _publish_silent(publish_target, topic, dumps(payload), stats, power)
+                    else:
+                        fake_mqtt_publish(topic, payload, stats, verbose=show_summary, show_json=show_json,
+                                          processor=processor)
+                
+                    batch.clear()
             
-            show_json = (
-                stats.message_count == 1 or  
-                stats.message_count % 1000 == 0 or  
-                (i + 1) == total_records 
-            )
+                if not fast_mode and (i + 1) % 100 == 0:
+                    print_progress(i + 1, total_records, stats, start_time, label=not dashboard)
+                    if _STOP.is_set():
+                        raise KeyboardInterrupt
             
-            show_summary = stats.message_count % 100 == 0
+                # Realistic publish rate delay
+                if pace_every and (i + 1) % pace_every == 0:
+                    sleep_for = pace_start + (i + 1) * interval - perf()
+                    if sleep_for > 0:
+                        sleep(sleep_for)
             
-            if mqtt_client and mqtt_client.connected:
-                real_mqtt_publish(mqtt_client, topic, payload, stats, verbose=show_summary, show_json=show_json)
-            else:
-                fake_mqtt_publish(topic, payload, stats, verbose=show_summary, show_json=show_json)
+            offset += pw_arr.size
             
-            if not (mqtt_client and mqtt_client.connected):
-                app_verbose = show_summary or stats.message_count % 1000 == 0
-                processor.process_json_message(topic, payload, verbose=app_verbose)
+            if fast_mode:
+                # One vectorized pass per chunk replaces per-message statistics
+                stats.add_batch(pw_arr)
+                refresh()
+                print_progress(offset, total_records, stats, start_time, label=not dashboard)
+                if _STOP.is_set():
+                    raise KeyboardInterrupt
+        
+        if publisher:
+            publisher.close()
+        
+        total_time = time.time() - start_time
+        
+        # Callers read the processor's results, so let broker deliveries catch up
+        if mqtt_client and mqtt_client.connected:
+            _wait_for_deliveries(processor, total_records)
+        
+        refresh()
+        
+        _write("".join([
+            f"\n{Colors.GREEN}{Colors.BOLD}{_BAR}\n",
+            f"✓ SIMULATION COMPLETE FOR {device_name.upper()}!\n",
+            f"{_BAR}{_RST}\n",
+            f"{Colors.BOLD}Final Statistics:{Colors.RESET}\n",
+            f"  Total Records Processed: {Colors.CYAN}{total_records:,}{Colors.RESET}\n",
+            f"  Total Messages: {Colors.CYAN}{stats.message_count:,}{Colors.RESET}\n",
+            f"  Average Power: {Colors.YELLOW}{stats.get_avg_power():.2f} W{Colors.RESET}\n",
+            f"  Max Power: {Colors.RED}{stats.max_power:.2f} W{Colors.RESET}\n",
+            f"  Min Power: {Colors.BLUE}{stats.min_power:.2f} W{Colors.RESET}\n",
+            f"  Total Time: {Colors.MAGENTA}{total_time:.2f} seconds{Colors.RESET}\n",
+            f"  Processing Rate: {Colors.CYAN}{total_records/total_time:.0f} records/second{Colors.RESET}\n",
+            f"{Colors.GREEN}{_BAR}{_RST}\n\n",
+        ]))
+        _report_publish_failures(publisher)
+        
+        return processor
+        
+    except KeyboardInterrupt:
+        _write(f"\n\n{Colors.YELLOW}Simulation interrupted by user.{Colors.RESET}\n")
+        return None
+    except FileNotFoundError:
+        _write(f"{Colors.RED}[ERROR]{Colors.RESET} File not found: {csv_file}\n")
+        return None
+    except Exception as e:
+        _write(f"{Colors.RED}[ERROR]{Colors.RESET} Simulation failed: {str(e)}\n")
+        return None
+    finally:
+        if publisher:
+            publisher.close()
+        
+def _load_merged(devices, sample_size=None, reader="pyarrow"):
+    """Read every device's CSV and merge the rows into one timestamp-ordered stream."""
+    iso_parts, pw_parts, code_parts = [], [], []
+    for code, device in enumerate(devices):
+        total_records = _count_records(device["csv_file"])
+        if sample_size is not None:
+            total_records = min(sample_size, total_records)
+        for iso_strings, pw_arr in _iter_chunks(device["csv_file"], total_records, 1_000_000, reader):
+            iso_parts.append(iso_strings)
+            pw_parts.append(pw_arr)
+            code_parts.append(np.full(pw_arr.size, code, dtype=np.int16))
+    
+    iso_strings = np.concatenate(iso_parts)
+    pw_arr = np.concatenate(pw_parts)
+    codes = np.concatenate(code_parts)
+    
+    # Stable sort keeps each device's own rows in file order on equal timestamps
+    order = np.argsort(iso_strings.astype("datetime64[s]"), kind="stable")
+    return iso_strings[order], pw_arr[order], codes[order]
+
+def _wait_for_deliveries(processor, expected, idle_timeout=5):
+    """Wait until the processor has received expected messages from the broker.
+
+    QoS 0 may drop messages, so give up after idle_timeout seconds without progress.
+    """
+    seen = processor.processed_count
+    idle_since = time.time()
+    while processor.processed_count < expected and time.time() - idle_since < idle_timeout:
+        time.sleep(0.1)
+        if processor.processed_count != seen:
+            seen = processor.processed_count
+            idle_since = time.time()
+
+def simulate_all_devices(devices, sample_size=None, publish_rate=10000.0, mqtt_client=None,
+                         reader="pyarrow", publish_threads=2, streaming_mode=False):
+    """Simulate all devices as a single stream published in timestamp order.
+
+    Messages are always published one sample at a time and progress is shown
+    as a single line (no live dashboard).
+    """
+    
+    publisher = None
+    
+    try:
+        if (reader == "pyarrow" and not PYARROW_AVAILABLE) or (reader == "polars" and not POLARS_AVAILABLE):
+            reader = "pandas"
+        
+        names = ", ".join(device["csv_file"] for device in devices)
+        print(f"{Colors.BLUE}[LOADING]{Colors.RESET} Reading and merging {names}...")
+        iso_strings, pw_arr, codes = _load_merged(devices, sample_size, reader)
+        total_records = pw_arr.size
+        print(f"{Colors.GREEN}[LOADED]{Colors.RESET} {total_records:,} records merged by timestamp\n")
+        
+        device_ids = [device["device_id"] for device in devices]
+        topics = [device.get("topic") or f"{device['topic_prefix']}/{device['device_id']}/power"
+                  for device in devices]
+        payloads = [{"device_id": device_id, "timestamp": "", "power": 0.0} for device_id in device_ids]
+        all_stats = [LiveStats(device["device_id"], device["name"]) for device in devices]
+        combined = LiveStats("all", "All devices")
+        
+        processor = ApplicationLayer(mqtt_client=mqtt_client, streaming_mode=streaming_mode)
+        processor.preallocate(total_records)
+        
+        if mqtt_client and mqtt_client.connected:
+            for topic in topics:
+                processor.subscribe_to_mqtt(f"{topic}/#")
+            if publish_threads > 0:
+                publisher = PublishWorker(mqtt_client, num_threads=publish_threads)
+        
+        print(f"{Colors.BOLD}Starting combined data stream simulation...{Colors.RESET}")
+        print(f"{Colors.YELLOW}Press Ctrl+C to stop{Colors.RESET}\n")
+        
+        start_time = time.time()
+        
+        interval = 1.0 / publish_rate if publish_rate else 0.0
+        pace_every = max(1, int(publish_rate // 100)) if publish_rate else 0
+        pace_start = time.perf_counter()
+        
+        perf = time.perf_counter
+        sleep = time.sleep
+        dumps = _dumps
+        ingest = processor.ingest
+        publish_target = publisher or mqtt_client
+        publish = publish_target.publish if mqtt_client and mqtt_client.connected else None
+        
+        block = 10_000
+        for start in range(0, total_records, block):
+            end = min(start + block, total_records)
+            block_iso = iso_strings[start:end].tolist()
+            block_pw = pw_arr[start:end].tolist()
+            block_codes = codes[start:end].tolist()
             
-            if (i + 1) % 100 == 0 or (i + 1) == total_records:
-                progress = ((i + 1) / total_records) * 100
-                progress_bar_length = 50
-                filled = int(progress_bar_length * progress / 100)
-                bar = "█" * filled + "░" * (progress_bar_length - filled)
+            for j in range(end - start):
+                code = block_codes[j]
+                if publish:
+                    payload = payloads[code]
+                    payload["timestamp"] = block_iso[j]
+                    payload["power"] = block_pw[j]
+                    publish(topics[code], dumps(payload), qos=0)
+                else:
+                    ingest(device_ids[code], block_iso[j], block_pw[j], topic=topics[code])
                 
-                avg_power = stats.get_avg_power()
-                elapsed_time = time.time() - start_time
-                if (i + 1) % 100 == 0:
-                    print(f"\r{Colors.CYAN}[PROGRESS]{Colors.RESET} [{bar}] {progress:.1f}% | "
-                          f"Mesaj: {i+1:,}/{total_records:,} | "
-                          f"Ortalama Güç: {avg_power:.2f}W | "
-                          f"Süre: {elapsed_time:.1f}s", 
-                          end="", flush=True)
+                i = start + j
+                if pace_every and (i + 1) % pace_every == 0:
+                    sleep_for = pace_start + (i + 1) * interval - perf()
+                    if sleep_for > 0:
+                        sleep(sleep_for)
             
-            # Realistic publish rate delay
-            time.sleep(1.0 / publish_rate)
+            # Per-device statistics in one vectorized pass per block
+            block_arr = pw_arr[start:end]
+            block_code_arr = codes[start:end]
+            for code, stats in enumerate(all_stats):
+                stats.add_batch(block_arr[block_code_arr == code])
+            combined.add_batch(block_arr)
+            
+            print_progress(end, total_records, combined, start_time)
+            _write("")
+            if _STOP.is_set():
+                raise KeyboardInterrupt
         
-        print_dashboard(stats, processor)
+        if publisher:
+            publisher.close()
         
         total_time = time.time() - start_time
-        print(f"\n{Colors.GREEN}{Colors.BOLD}{'='*80}")
-        print(f"✓ SIMULATION COMPLETE FOR {device_name.upper()}!")
-        print(f"{'='*80}{Colors.RESET}")
-        print(f"{Colors.BOLD}Final Statistics:{Colors.RESET}")
-        print(f"  Total Records Processed: {Colors.CYAN}{total_records:,}{Colors.RESET}")
-        print(f"  Total Messages: {Colors.CYAN}{stats.message_count:,}{Colors.RESET}")
-        print(f"  Average Power: {Colors.YELLOW}{stats.get_avg_power():.2f} W{Colors.RESET}")
-        print(f"  Max Power: {Colors.RED}{stats.max_power:.2f} W{Colors.RESET}")
-        print(f"  Min Power: {Colors.BLUE}{stats.min_power:.2f} W{Colors.RESET}")
-        print(f"  Total Time: {Colors.MAGENTA}{total_time:.2f} seconds{Colors.RESET}")
-        print(f"  Processing Rate: {Colors.CYAN}{total_records/total_time:.0f} records/second{Colors.RESET}")
-        print(f"{Colors.GREEN}{'='*80}{Colors.RESET}\n")
+        buf = [
+            f"\n\n{Colors.GREEN}{Colors.BOLD}{_BAR}\n",
+            "✓ COMBINED SIMULATION COMPLETE!\n",
+            f"{_BAR}{_RST}\n",
+        ]
+        for stats in all_stats:
+            buf.append(f"  {stats.device_name}: {Colors.CYAN}{stats.message_count:,}{_RST} messages, "
+                       f"avg {Colors.YELLOW}{stats.get_avg_power():.2f} W{_RST}\n")
+        buf.append(f"  Total Time: {Colors.MAGENTA}{total_time:.2f} seconds{_RST}\n")
+        buf.append(f"  Processing Rate: {Colors.CYAN}{total_records/total_time:.0f} records/second{_RST}\n")
+        buf.append(f"{Colors.GREEN}{_BAR}{_RST}\n\n")
+        _write("".join(buf))
+        _report_publish_failures(publisher)
+        
+        # The caller reads the processor's results, so let broker deliveries catch up
+        if publish:
+            _wait_for_deliveries(processor, total_records)
         
         return processor
         
     except KeyboardInterrupt:
-        print(f"\n\n{Colors.YELLOW}Simulation interrupted by user.{Colors.RESET}")
+        _write(f"\n\n{Colors.YELLOW}Simulation interrupted by user.{Colors.RESET}\n")
         return None
-    except FileNotFoundError:
-        print(f"{Colors.RED}[ERROR]{Colors.RESET} File not found: {csv_file}")
+    except FileNotFoundError as e:
+        _write(f"{Colors.RED}[ERROR]{Colors.RESET} File not found: {e.filename}\n")
         return None
     except Exception as e:
-        print(f"{Colors.RED}[ERROR]{Colors.RESET} Simulation failed: {str(e)}")
+        _write(f"{Colors.RED}[ERROR]{Colors.RESET} Simulation failed: {str(e)}\n")
         return None
+    finally:
+        if publisher:
+            publisher.close()
         
+def _init_sim_worker(print_lock):
+    """Share the parent's output lock with a device worker process."""
+    global _PRINT_LOCK
+    _PRINT_LOCK = print_lock
+
+def _sim_worker(device, sample_size, publish_rate, mqtt_config, run_options):
+    """Simulate one device in a worker process and return picklable results."""
+    mqtt_client = None
+    if mqtt_config:
+        mqtt_client = _create_mqtt_client(**mqtt_config)
+        if not mqtt_client.connect():
+            _write(f"{Colors.YELLOW}[WARNING]{Colors.RESET} MQTT connection failed for "
+                   f"{device['device_id']}. Simulating locally...\n")
+            mqtt_client = None
+    
+    try:
+        processor = simulate_device(
+            device["name"],
+            device["csv_file"],
+            device["device_id"],
+            device["topic_prefix"],
+            sample_size,
+            publish_rate,
+            mqtt_client=mqtt_client,
+            topic=device["topic"],
+            **run_options
+        )
+    finally:
+        if mqtt_client:
+            mqtt_client.disconnect()
+    
+    if processor is None:
+        return None
+    # The processor holds client callbacks and large arrays; send back only the summary
+    return SimpleNamespace(device_stats=processor.device_stats,
+                           processed_count=processor.processed_count)
+
 # Main
 
 def main():
-   """Run simulation."""
+    """Run simulation."""
     
     # Clear screen and show header
     clear_screen()
-    print(f"{Colors.BOLD}{Colors.CYAN}{'='*80}")
+    print(_HDR)
     print("IoT-BASED APPLIANCE USAGE TRACKER - SIMULATION")
-    print("="*80 + Colors.RESET)
+    print(_BAR + _RST)
     print(f"\n{Colors.GREEN}Starting IoT Simulation System...{Colors.RESET}")
     print(f"{Colors.BLUE}Simulating: ESP32 Smart Plugs + MQTT + Cloud Processor{Colors.RESET}\n")
    
@@ -557,23 +1425,35 @@ def main():
     MQTT_BROKER_PORT = 1883
     MQTT_USERNAME = None  
     MQTT_PASSWORD = None  
+    MQTT_POOL_SIZE = 4  # Parallel broker connections used round-robin (1 = single client)
+    MQTT_BACKEND = "paho"  # "paho" or "gmqtt" (asyncio client on a background thread)
+    COMBINED_RUN = False  # Merge all devices into one timestamp-ordered stream
+    PARALLEL_BACKEND = "process"  # "process" (one per device, own MQTT connection) or "thread"
+    
+    mqtt_settings = dict(
+        pool_size=MQTT_POOL_SIZE,
+        broker_host=MQTT_BROKER_HOST,
+        broker_port=MQTT_BROKER_PORT,
+        username=MQTT_USERNAME,
+        password=MQTT_PASSWORD,
+        backend=MQTT_BACKEND
+    )
     
     mqtt_client = None
     
     if USE_REAL_MQTT:
-        if not MQTT_AVAILABLE:
-            print(f"{Colors.RED}[ERROR]{Colors.RESET} paho-mqtt not installed!")
-            print(f"{Colors.YELLOW}Install with: pip install paho-mqtt{Colors.RESET}")
+        mqtt_package = "gmqtt" if MQTT_BACKEND == "gmqtt" else "paho-mqtt"
+        if not _import_mqtt_backend(MQTT_BACKEND):
+            print(f"{Colors.RED}[ERROR]{Colors.RESET} {mqtt_package} not installed!")
+            print(f"{Colors.YELLOW}Install with: pip install {mqtt_package}{Colors.RESET}")
             print(f"{Colors.YELLOW}Switching to simulation mode...{Colors.RESET}\n")
             USE_REAL_MQTT = False
         else:
             try:
-                mqtt_client = MQTTClient(
-                    broker_host=MQTT_BROKER_HOST,
-                    broker_port=MQTT_BROKER_PORT,
-                    username=MQTT_USERNAME,
-                    password=MQTT_PASSWORD
-                )
+                # Worker processes open their own pools; the parent only checks the broker
+                check_only = PARALLEL_BACKEND == "process" and not COMBINED_RUN
+                mqtt_client = _create_mqtt_client(**dict(mqtt_settings, pool_size=1) if check_only
+                                                  else mqtt_settings)
                 if mqtt_client.connect():
                     print(f"{Colors.GREEN}✓ Using REAL MQTT broker{Colors.RESET}\n")
                 else:
@@ -592,7 +1472,12 @@ def main():
         print(f"{Colors.GREEN}  Device Layer → MQTT Publish → Communication Layer (MQTT Broker) → MQTT Subscribe → Application Layer (JSON){Colors.RESET}\n")
     
     SAMPLE_SIZE = None  
-    PUBLISH_RATE = 10000.0  
+    PUBLISH_RATE = 10000.0  # Messages per second (None = no throttle)
+    BATCH_SIZE = 1  # Samples per MQTT message (>1 publishes to .../power/batch)
+    COMPRESS_BATCHES = False  # zlib-compress batched payloads (published to .../power/batch/gz)
+    FAST_MODE = False  # Skip per-message output; aggregate statistics in bulk
+    PUBLISH_THREADS = 2  # Background publisher threads for the real broker (0 = publish inline)
+    STREAMING_MODE = True  # Processor keeps running statistics only, not every received message
     
     # Device configurations
     devices = [
@@ -610,43 +1495,87 @@ def main():
         }
     ]
     
-    all_processors = []
-    
-    # Simulate each device
+    # Full publish topic per device, built once
     for device in devices:
-        processor = simulate_device(
-            device["name"],
-            device["csv_file"],
-            device["device_id"],
-            device["topic_prefix"],
-            SAMPLE_SIZE,
-            PUBLISH_RATE,
-            mqtt_client=mqtt_client
-        )
-        
-        if processor:
-            all_processors.append(processor)
-        
-        # Pause between devices
-        if device != devices[-1]:
-            print(f"\n{Colors.CYAN}Preparing next device simulation...{Colors.RESET}\n")
-            time.sleep(2)
+        device["topic"] = f"{device['topic_prefix']}/{device['device_id']}/power"
+    
+    run_options = dict(
+        batch_size=BATCH_SIZE,
+        fast_mode=FAST_MODE,
+        publish_threads=PUBLISH_THREADS,
+        compress=COMPRESS_BATCHES,
+        streaming_mode=STREAMING_MODE,
+        # The live dashboard is drawn only for a single device: concurrent devices would
+        # overwrite each other's full-screen frame, so they log tagged progress lines instead
+        dashboard=len(devices) == 1
+    )
+    
+    if COMBINED_RUN:
+        ignored = [name for name, enabled in (("BATCH_SIZE", BATCH_SIZE > 1), ("FAST_MODE", FAST_MODE),
+                                              ("COMPRESS_BATCHES", COMPRESS_BATCHES)) if enabled]
+        if ignored:
+            print(f"{Colors.YELLOW}[WARNING]{Colors.RESET} COMBINED_RUN ignores {', '.join(ignored)}\n")
+        results = [simulate_all_devices(devices, SAMPLE_SIZE, PUBLISH_RATE, mqtt_client=mqtt_client,
+                                        publish_threads=PUBLISH_THREADS, streaming_mode=STREAMING_MODE)]
+    elif PARALLEL_BACKEND == "process":
+        # One process per device so parsing, serialization and stats run on separate cores;
+        # MQTT connections cannot cross process boundaries, so each worker opens its own
+        mqtt_config = mqtt_settings if mqtt_client else None
+        if mqtt_client:
+            mqtt_client.disconnect()
+            mqtt_client = None
+        with ProcessPoolExecutor(max_workers=len(devices), initializer=_init_sim_worker,
+                                 initargs=(multiprocessing.Lock(),)) as executor:
+            futures = [
+                executor.submit(_sim_worker, device, SAMPLE_SIZE, PUBLISH_RATE, mqtt_config, run_options)
+                for device in devices
+            ]
+            results = [future.result() for future in futures]
+    else:
+        # Simulate all devices concurrently; each has its own CSV, stats and topic
+        with ThreadPoolExecutor(max_workers=len(devices)) as executor:
+            futures = [
+                executor.submit(
+                    simulate_device,
+                    device["name"],
+                    device["csv_file"],
+                    device["device_id"],
+                    device["topic_prefix"],
+                    SAMPLE_SIZE,
+                    PUBLISH_RATE,
+                    mqtt_client=mqtt_client,
+                    topic=device["topic"],
+                    **run_options
+                )
+                for device in devices
+            ]
+            try:
+                results = [future.result() for future in futures]
+            except KeyboardInterrupt:
+                _STOP.set()
+                raise
+    
+    all_processors = [processor for processor in results if processor]
     
     clear_screen()
-    print(f"{Colors.BOLD}{Colors.CYAN}{'='*80}")
+    print(_HDR)
     print("SIMULATION COMPLETE - FINAL SUMMARY")
     print("TÜM VERİLER İŞLENDİ (fridge_207.csv + vacuum_254.csv)")
-    print("="*80 + Colors.RESET)
+    print(_BAR + _RST)
+    
+    # A combined run has one processor holding every device's statistics
+    stats_by_device = {}
+    for processor in all_processors:
+        stats_by_device.update(processor.device_stats)
     
-    total_messages = sum(len(p.received_messages) for p in all_processors)
+    total_messages = sum(p.processed_count for p in all_processors)
     print(f"\n{Colors.BOLD}Genel İstatistikler:{Colors.RESET}")
-    print(f"  Simüle Edilen Cihaz Sayısı: {Colors.GREEN}{len(all_processors)}{Colors.RESET}")
+    print(f"  Simüle Edilen Cihaz Sayısı: {Colors.GREEN}{len(stats_by_device)}{Colors.RESET}")
     print(f"  Toplam İşlenen Mesaj: {Colors.BLUE}{total_messages:,}{Colors.RESET}")
     
     print(f"\n{Colors.BOLD}Cihaz Bazında Detaylar:{Colors.RESET}")
-    for i, processor in enumerate(all_processors):
-        device = devices[i]
-        device_stats = processor.device_stats.get(device['device_id'], {})
+    for device in devices:
+        device_stats = stats_by_device.get(device['device_id'], {})
         
         if device_stats:
             avg_power = device_stats['total_power'] / device_stats['message_count'] if device_stats['message_count'] > 0 else 0
@@ -657,13 +1586,13 @@ def main():
             print(f"    Minimum Güç: {Colors.BLUE}{device_stats['min_power']:.2f} W{Colors.RESET}")
         else:
             print(f"\n  {Colors.BOLD}{device['name']} ({device['device_id']}):{Colors.RESET}")
-            print(f"    Mesaj Sayısı: {Colors.CYAN}{len(processor.received_messages):,}{Colors.RESET}")
+            print(f"    Mesaj Sayısı: {Colors.CYAN}0{Colors.RESET}")
     
-    print(f"\n{Colors.GREEN}{Colors.BOLD}{'='*80}")
+    print(f"\n{Colors.GREEN}{Colors.BOLD}{_BAR}")
     print("✓ TÜM VERİLER BAŞARIYLA İŞLENDİ!")
     print("  - fridge_207.csv: TAMAMEN İŞLENDİ")
     print("  - vacuum_254.csv: TAMAMEN İŞLENDİ")
-    print("="*80 + Colors.RESET + "\n")
+    print(_BAR + _RST + "\n")
     
     if mqtt_client:
         mqtt_client.disconnect()